@@ -49,6 +49,8 @@ class Config(BaseModel):
     """是否使用 cookie 解析小红书"""
     parser_enable_message_reaction: bool = True
     """是否在解析过程中发送 reaction 表情"""
+    parser_persist_result_cache: bool = True
+    """是否在重启后保留解析结果缓存"""
     parser_bili_video_codes: list[VideoCodecs] = [
         VideoCodecs.AVC,
         VideoCodecs.AV1,
@@ -169,6 +171,11 @@ class Config(BaseModel):
         """是否在解析过程中发送 reaction 表情"""
         return self.parser_enable_message_reaction
 
+    @property
+    def persist_result_cache(self) -> bool:
+        """是否在重启后保留解析结果缓存"""
+        return self.parser_persist_result_cache
+
 
 pconfig: Config = get_plugin_config(Config)
 """配置"""
@@ -1,15 +1,21 @@
 """统一的解析器 matcher"""
 
-from typing import Literal
+import asyncio
+import re
+from typing import Literal, cast
 
-from nonebot import get_driver, logger
-from nonebot.adapters import Event
-from nonebot_plugin_alconna import SupportAdapter
+from nonebot import get_driver, logger, on_command
+from nonebot.adapters import Event, Message
+from nonebot.params import CommandArg
+from nonebot_plugin_alconna import SupportAdapter, UniMessage, uniseg
 
 from ..config import pconfig
-from ..parsers import BaseParser, ParseResult
+from ..download import DOWNLOADER, YTDLP_DOWNLOADER
+from ..helper import UniHelper
+from ..parsers import BaseParser, BilibiliParser, ParseResult
 from ..renders import get_renderer
-from ..utils import LimitedSizeDict
+from ..utils import LRUCache
+from .cache import load_result_cache, save_result_cache
 from .rule import Searched, SearchResult, on_keyword_regex
 
 
@@ -27,48 +33,102 @@ KEYWORD_PARSER_MAP: dict[str, BaseParser] = {}
 def register_parser_matcher():
     enabled_parser_classes = _get_enabled_parser_classes()
 
-    enabled_platform_names = []
+    enabled_platform_names: list[str] = []
+    patterns: list[tuple[str, str]] = []
     for _cls in enabled_parser_classes:
         parser = _cls()
         enabled_platform_names.append(parser.platform.display_name)
-        for keyword, _ in _cls.patterns:
+        for keyword, pattern in _cls.patterns:
             KEYWORD_PARSER_MAP[keyword] = parser
+            patterns.append((keyword, pattern))
     logger.info(f"启用平台: {', '.join(sorted(enabled_platform_names))}")
 
-    patterns = [p for _cls in enabled_parser_classes for p in _cls.patterns]
     matcher = on_keyword_regex(*patterns)
     matcher.append_handler(parser_handler)
 
 
 # 缓存结果
-_RESULT_CACHE = LimitedSizeDict[str, ParseResult](max_size=50)
+_RESULT_CACHE = LRUCache[str, ParseResult](max_size=50)
+
+
+# 缓存持久化文件, 与资源文件同在缓存目录, 随定时清理一并删除
+_RESULT_CACHE_FILE = pconfig.cache_dir / "result_cache.msgpack"
 
 
 def clear_result_cache():
     _RESULT_CACHE.clear()
 
 
+@get_driver().on_startup
+def restore_result_cache():
+    if pconfig.persist_result_cache:
+        load_result_cache(_RESULT_CACHE, _RESULT_CACHE_FILE)
+
+
+@get_driver().on_shutdown
+def persist_result_cache():
+    if pconfig.persist_result_cache:
+        save_result_cache(_RESULT_CACHE, _RESULT_CACHE_FILE)
+
+
+# 进行中的解析, 相同链接并发到达时共享同一次解析
+_INFLIGHT: dict[str, asyncio.Future[ParseResult]] = {}
+
+
+async def _parse_once(cache_key: str, sr: SearchResult) -> ParseResult:
+    """合并相同链接的并发解析请求"""
+    while (future := _INFLIGHT.get(cache_key)) is not None:
+        logger.debug(f"等待进行中的解析: {cache_key}")
+        try:
+            # shield 防止等待者被取消时连带取消共享的 future
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # 等待者自身被取消时继续抛出; 发起者被取消时, 由等待者重新发起解析
+            if not future.cancelled():
+                raise
+
+    future = asyncio.get_running_loop().create_future()
+    _INFLIGHT[cache_key] = future
+    try:
+        parser = KEYWORD_PARSER_MAP[sr.keyword]
+        result = await parser.parse(sr.keyword, sr.searched)
+    except Exception as e:
+        if not future.done():
+            future.set_exception(e)
+            # 标记异常已获取, 避免无等待者时 asyncio 告警
+            future.exception()
+        raise
+    else:
+        if not future.done():
+            future.set_result(result)
+        return result
+    finally:
+        # 发起者被取消时取消共享的 future, 等待者会重新发起解析
+        if not future.done():
+            future.cancel()
+        _INFLIGHT.pop(cache_key, None)
+
+
 async def parser_handler(
     event: Event,
     sr: SearchResult = Searched(),
 ):
     """统一的解析处理器"""
     # 响应用户处理中
-    await _message_reaction(event, "resolving")
+    reaction_target = _get_reaction_target(event)
+    await _message_reaction(reaction_target, "resolving")
 
     # 1. 获取缓存结果
     cache_key = sr.searched.group(0)
     result = _RESULT_CACHE.get(cache_key)
 
     if result is None:
-        # 2. 获取对应平台 parser
-        parser = KEYWORD_PARSER_MAP[sr.keyword]
-
+        # 2. 使用对应平台 parser 解析
         try:
-            result = await parser.parse(sr.keyword, sr.searched)
+            result = await _parse_once(cache_key, sr)
         except Exception:
             # await UniMessage(str(e)).send()
-            await _message_reaction(event, "fail")
+            await _message_reaction(reaction_target, "fail")
             raise
         logger.debug(f"解析结果: {result}")
     else:
@@ -80,62 +140,72 @@ async def parser_handler(
         async for message in renderer.render_messages(result):
             await message.send()
     except Exception:
-        await _message_reaction(event, "fail")
+        await _message_reaction(reaction_target, "fail")
         raise
 
     # 4. 无 raise 再缓存解析结果
     _RESULT_CACHE[cache_key] = result
 
     # 5. 添加成功的消息响应
-    await _message_reaction(event, "done")
+    await _message_reaction(reaction_target, "done")
 
 
-from nonebot_plugin_alconna import uniseg
+# 消息响应表情 (onebot11/qq 表情 ID, 其他适配器 emoji)
+_REACTION_EMOJI_MAP: dict[str, tuple[str, str]] = {
+    "fail": ("10060", "❌"),
+    "resolving": ("424", "👀"),
+    "done": ("144", "🎉"),
+}
+
+# 不支持消息响应的适配器
+_REACTION_UNSUPPORTED: set[str] = set()
+
+
+def _get_reaction_target(event: Event) -> tuple[str, str | None] | None:
+    """获取消息响应所需的 (message_id, adapter), 未启用或适配器不支持时返回 None"""
+    if not pconfig.enable_message_reaction:
+        return None
+
+    adapter = uniseg.get_target(event).adapter
+    if adapter in _REACTION_UNSUPPORTED:
+        return None
+    return uniseg.get_message_id(event), adapter
 
 
 async def _message_reaction(
-    event: Event,
+    reaction_target: tuple[str, str | None] | None,
     status: Literal["fail", "resolving", "done"],
 ) -> None:
-    if not pconfig.enable_message_reaction:
+    if reaction_target is None:
         return
 
-    emoji_map = {
-        "fail": ("10060", "❌"),
-        "resolving": ("424", "👀"),
-        "done": ("144", "🎉"),
-    }
-    message_id = uniseg.get_message_id(event)
-    target = uniseg.get_target(event)
+    message_id, adapter = reaction_target
+    if adapter in _REACTION_UNSUPPORTED:
+        return
 
-    if target.adapter in (SupportAdapter.onebot11, SupportAdapter.qq):
-        emoji = emoji_map[status][0]
+    if adapter in (SupportAdapter.onebot11, SupportAdapter.qq):
+        emoji = _REACTION_EMOJI_MAP[status][0]
     else:
-        emoji = emoji_map[status][1]
+        emoji = _REACTION_EMOJI_MAP[status][1]
 
     try:
         await uniseg.message_reaction(emoji, message_id=message_id)
+    except uniseg.SerializeFailed:
+        if adapter is not None:
+            _REACTION_UNSUPPORTED.add(adapter)
+        logger.warning(f"adapter {adapter} not support message reaction, skip it from now on")
     except Exception:
         logger.warning(f"reaction {emoji} to {message_id} failed, maybe not support")
 
 
-import re
-from typing import cast
-
-from nonebot import on_command
-from nonebot.adapters import Message
-from nonebot.params import CommandArg
-from nonebot_plugin_alconna import UniMessage
-
-from ..download import DOWNLOADER
-from ..helper import UniHelper
-from ..parsers import BilibiliParser
+# BV 号及可选的分 P 序号
+_BM_RE = re.compile(r"(BV[A-Za-z0-9]{10})(?:\s(\d{1,3}))?")
 
 
 @on_command("bm", priority=3, block=True).handle()
 async def _(message: Message = CommandArg()):
     text = message.extract_plain_text()
-    matched = re.search(r"(BV[A-Za-z0-9]{10})(\s\d{1,3})?", text)
+    matched = _BM_RE.search(text)
     if not matched:
         await UniMessage("请发送正确的 BV 号").finish()
 
@@ -157,8 +227,6 @@ async def _(message: Message = CommandArg()):
         await UniMessage(UniHelper.file_seg(audio_path)).send()
 
 
-from ..download import YTDLP_DOWNLOADER
-
 if YTDLP_DOWNLOADER is not None:
     from ..parsers import YouTubeParser
 
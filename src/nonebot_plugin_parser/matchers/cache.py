@@ -0,0 +1,143 @@
+"""解析结果缓存的持久化, 重启后复用已解析且资源仍在本地的结果"""
+
+from asyncio import Task
+from dataclasses import fields
+from pathlib import Path
+from typing import Any
+
+import msgspec
+from nonebot import logger
+
+from ..parsers.data import (
+    AudioContent,
+    Author,
+    DynamicContent,
+    GraphicsContent,
+    ImageContent,
+    MediaContent,
+    ParseResult,
+    Platform,
+    VideoContent,
+)
+from ..utils import LRUCache
+
+_CONTENT_TYPES: dict[str, type[MediaContent]] = {
+    _cls.__name__: _cls for _cls in (AudioContent, VideoContent, ImageContent, DynamicContent, GraphicsContent)
+}
+
+# 内容中保存路径的字段
+_PATH_FIELDS = frozenset(("path_task", "cover", "gif_path"))
+
+
+def _dump_path(path_task: Path | Task[Path] | None) -> str | None:
+    """Path 或已完成的 Task 转为字符串路径, 未完成的 Task 无法持久化"""
+    if path_task is None:
+        return None
+    if isinstance(path_task, Task):
+        if not path_task.done() or path_task.cancelled() or path_task.exception() is not None:
+            raise ValueError("下载任务未完成")
+        path_task = path_task.result()
+    return str(path_task)
+
+
+def _load_path(path: str | None) -> Path | None:
+    """字符串路径转为 Path, 文件不存在时抛出 FileNotFoundError"""
+    if path is None:
+        return None
+    file = Path(path)
+    if not file.exists():
+        raise FileNotFoundError(path)
+    return file
+
+
+def _dump_content(content: MediaContent) -> dict[str, Any]:
+    data: dict[str, Any] = {"type": type(content).__name__}
+    for _field in fields(content):
+        value = getattr(content, _field.name)
+        data[_field.name] = _dump_path(value) if _field.name in _PATH_FIELDS else value
+    return data
+
+
+def _load_content(data: dict[str, Any]) -> MediaContent:
+    content_cls = _CONTENT_TYPES[data.pop("type")]
+    for name in _PATH_FIELDS.intersection(data):
+        data[name] = _load_path(data[name])
+    return content_cls(**data)
+
+
+def _dump_result(result: ParseResult) -> dict[str, Any]:
+    author = None
+    if result.author is not None:
+        author = {
+            "name": result.author.name,
+            "avatar": _dump_path(result.author.avatar),
+            "description": result.author.description,
+        }
+    return {
+        "platform": {"name": result.platform.name, "display_name": result.platform.display_name},
+        "author": author,
+        "title": result.title,
+        "text": result.text,
+        "timestamp": result.timestamp,
+        "url": result.url,
+        "contents": [_dump_content(content) for content in result.contents],
+        "extra": result.extra,
+        "repost": _dump_result(result.repost) if result.repost is not None else None,
+        "render_image": _dump_path(result.render_image),
+    }
+
+
+def _load_result(data: dict[str, Any]) -> ParseResult:
+    author = None
+    if (author_data := data["author"]) is not None:
+        author = Author(
+            name=author_data["name"],
+            avatar=_load_path(author_data["avatar"]),
+            description=author_data["description"],
+        )
+    return ParseResult(
+        platform=Platform(**data["platform"]),
+        author=author,
+        title=data["title"],
+        text=data["text"],
+        timestamp=data["timestamp"],
+        url=data["url"],
+        contents=[_load_content(content) for content in data["contents"]],
+        extra=data["extra"],
+        repost=_load_result(data["repost"]) if data["repost"] is not None else None,
+        render_image=_load_path(data["render_image"]),
+    )
+
+
+def save_result_cache(cache: LRUCache[str, ParseResult], file: Path) -> None:
+    """按 LRU 顺序将缓存写入文件, 跳过无法持久化的结果"""
+    entries: list[tuple[str, msgspec.Raw]] = []
+    for key, result in cache.items():
+        # 逐条编码, 个别结果 (如 extra 中含有无法序列化的对象) 失败不影响其他结果
+        try:
+            entries.append((key, msgspec.Raw(msgspec.msgpack.encode(_dump_result(result)))))
+        except Exception as e:
+            logger.debug(f"跳过无法持久化的解析结果: {key}, {e}")
+    try:
+        file.write_bytes(msgspec.msgpack.encode(entries))
+    except Exception:
+        logger.exception(f"解析结果缓存写入 {file} 失败")
+        return
+    logger.info(f"已持久化 {len(entries)} 条解析结果缓存")
+
+
+def load_result_cache(cache: LRUCache[str, ParseResult], file: Path) -> None:
+    """从文件恢复缓存, 资源文件已被清理的结果将被丢弃"""
+    if not file.exists():
+        return
+    try:
+        entries = msgspec.msgpack.decode(file.read_bytes(), type=list[tuple[str, dict[str, Any]]])
+    except Exception:
+        logger.exception(f"解析结果缓存 {file} 读取失败")
+        return
+    for key, data in entries:
+        try:
+            cache[key] = _load_result(data)
+        except Exception as e:
+            logger.debug(f"丢弃失效的解析结果缓存: {key}, {e}")
+    logger.info(f"已恢复 {len(cache)} 条解析结果缓存")
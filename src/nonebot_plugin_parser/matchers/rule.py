@@ -1,6 +1,7 @@
+from functools import lru_cache
 import json
 import re
-from typing import Any, Literal
+from typing import Any, Literal, cast
 
 from nonebot import logger
 from nonebot.matcher import Matcher
@@ -112,13 +113,64 @@ class KeyPatternList(list[tuple[str, re.Pattern[str]]]):
             self.append((key, pattern))
 
 
+# 匹配命名分组 (?P<name>, 合并正则时转为非捕获分组, 避免组名冲突
+_NAMED_GROUP_RE = re.compile(r"(?<!\\)\(\?P<\w+>")
+# 反向引用 (?P=name), \1, 条件分组 (?(1)...), 合并后分组名和编号改变, 无法合并
+_BACKREF_RE = re.compile(r"(?<!\\)(?:\(\?P=|\\[1-9]|\(\?\()")
+# 模式开头的全局内联标志, 如 (?i), 合并时改由作用域标志表示
+_GLOBAL_FLAGS_RE = re.compile(r"^\(\?[aiLmsux]+\)")
+# 可转为作用域内联标志的 flags
+_SCOPED_FLAGS: tuple[tuple[re.RegexFlag, str], ...] = (
+    (re.ASCII, "a"),
+    (re.IGNORECASE, "i"),
+    (re.MULTILINE, "m"),
+    (re.DOTALL, "s"),
+    (re.VERBOSE, "x"),
+)
+
+
+def _union_alternative(pattern: re.Pattern[str]) -> str:
+    """将模式转为可放入合并正则的子表达式, 保留编译时的 flags
+
+    Raises:
+        ValueError: 模式包含反向引用, 无法合并
+    """
+    source = pattern.pattern
+    if _BACKREF_RE.search(source):
+        raise ValueError(f"pattern with backreference can't be combined: {source!r}")
+    source = _NAMED_GROUP_RE.sub("(?:", _GLOBAL_FLAGS_RE.sub("", source))
+    flags = "".join(char for flag, char in _SCOPED_FLAGS if pattern.flags & flag)
+    if not flags:
+        return source
+    # VERBOSE 模式下结尾的注释会吞掉右括号, 需要换行
+    tail = "\n" if pattern.flags & re.VERBOSE else ""
+    return f"(?{flags}:{source}{tail})"
+
+
+@lru_cache(maxsize=128)
+def _union_pattern(alternatives: tuple[str, ...]) -> re.Pattern[str]:
+    """将模式合并为一个正则, 每个模式后接一个空的命名分组 p{idx} 作为标记
+
+    标记分组放在模式之后, 分支在某个位置失配时不必先记录分组起点, 比把模式包在命名分组内更快;
+    合并正则没有公共的首字符集合, sre 仍会在每个位置尝试所有分支, 因此调用方应先用关键词筛选模式
+    """
+    return re.compile("|".join(alternatives))
+
+
 class KeywordRegexRule:
-    """检查消息是否含有关键词, 有关键词进行正则匹配"""
+    """检查消息是否含有关键词, 有关键词进行正则匹配
+
+    消息中有多个可匹配的链接时, 选择最靠前的一个 (同一位置按模式顺序), 而非按模式列表的顺序
+    """
 
-    __slots__ = ("key_pattern_list",)
+    __slots__ = ("alternatives", "key_pattern_list")
 
     def __init__(self, key_pattern_list: KeyPatternList):
         self.key_pattern_list = key_pattern_list
+        # 合并正则的各个分支, 构造时转换, 无法合并的模式尽早报错
+        self.alternatives = tuple(
+            f"(?:{_union_alternative(pattern)})(?P<p{idx}>)" for idx, (_, pattern) in enumerate(key_pattern_list)
+        )
 
     def __repr__(self) -> str:
         return f"KeywordRegex(key_pattern_list={self.key_pattern_list})"
@@ -134,13 +186,19 @@ class KeywordRegexRule:
         if not text:
             return False
 
-        for keyword, pattern in self.key_pattern_list:
-            if keyword not in text:
-                continue
-            if searched := pattern.search(text):
+        # 先用关键词过滤, 只合并关键词存在的模式, 不含关键词的消息无需运行正则
+        indexes = [idx for idx, (keyword, _) in enumerate(self.key_pattern_list) if keyword in text]
+        if not indexes:
+            return False
+
+        # 合并正则一次扫描定位最左侧的匹配, 再用对应模式重新匹配以保留其分组
+        union_pattern = _union_pattern(tuple(self.alternatives[idx] for idx in indexes))
+        if union_searched := union_pattern.search(text):
+            keyword, pattern = self.key_pattern_list[int(cast(str, union_searched.lastgroup)[1:])]
+            if searched := pattern.match(text, union_searched.start()):
                 state[PSR_SEARCHED_KEY] = SearchResult(text=text, keyword=keyword, searched=searched)
                 return True
-            logger.debug(f"keyword '{keyword}' is in '{text}', but not matched")
+        logger.debug(f"keywords {[self.key_pattern_list[idx][0] for idx in indexes]} in '{text}', but not matched")
         return False
 
 
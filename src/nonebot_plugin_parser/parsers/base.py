@@ -143,21 +143,21 @@ class BaseParser(ABC):
         self,
         image_urls: list[str],
     ):
-        """创建图片内容列表"""
+        """创建图片内容, 逐个生成, 不构建中间列表"""
         from .data import ImageContent
 
-        img_tasks = [DOWNLOADER.download_img(url, ext_headers=self.headers) for url in image_urls]
-        return [ImageContent(task) for task in img_tasks]
+        for url in image_urls:
+            yield ImageContent(DOWNLOADER.download_img(url, ext_headers=self.headers))
 
     def create_dynamic_contents(
         self,
         dynamic_urls: list[str],
     ):
-        """创建动态图片内容列表"""
+        """创建动态图片内容, 逐个生成, 不构建中间列表"""
         from .data import DynamicContent
 
-        dynamic_tasks = [DOWNLOADER.download_video(url, ext_headers=self.headers) for url in dynamic_urls]
-        return [DynamicContent(task) for task in dynamic_tasks]
+        for url in dynamic_urls:
+            yield DynamicContent(DOWNLOADER.download_video(url, ext_headers=self.headers))
 
     def create_audio_content(
         self,
@@ -1,15 +1,42 @@
-import json
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 import re
 from typing import Any, ClassVar
 from typing_extensions import override
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import urlparse
 
-from httpx import AsyncClient, Cookies
+from httpx import AsyncClient, Cookies, Limits, Response, TooManyRedirects
+import msgspec
 from msgspec import Struct, convert, field
-from nonebot import logger
+from nonebot import get_driver, logger
 
 from .base import BaseParser, ParseException, Platform, PlatformEnum, pconfig
 
+# ?: 非捕获组
+_XHS_ID_RE = re.compile(r"(?:/explore/|/discovery/item/|source=note&noteId=)(\w+)")
+_XSEC_SOURCE_RE = re.compile(r"[?&]xsec_source=([^&#]+)")
+_XSEC_TOKEN_RE = re.compile(r"[?&]xsec_token=([^&#]+)")
+_INITIAL_STATE_MARKER = b"window.__INITIAL_STATE__="
+_INITIAL_STATE_RE = re.compile(rb"window\.__INITIAL_STATE__=(.*?)</script>", re.DOTALL)
+_UNDEFINED = b"undefined"
+# 字符串整体匹配后原样保留，字符串之外的 undefined 替换为 null，不影响字符串中的 "undefined" 文本
+_UNDEFINED_RE = re.compile(rb'("[^"\\]*(?:\\.[^"\\]*)*")|undefined')
+
+
+def _replace_undefined(matched: re.Match[bytes]) -> bytes:
+    return matched.group(1) or b"null"
+
+
+def _undefined_to_null(json_bytes: bytes) -> bytes:
+    """将字符串之外的 undefined 替换为 null"""
+    parts = json_bytes.split(_UNDEFINED)
+    if len(parts) == 1:
+        return json_bytes
+    # 不含转义反斜杠时 \" 必为转义引号，若每个 undefined 之前的其余引号均成对，则它们都在字符串之外，直接整体替换
+    if b"\\\\" not in json_bytes and not any((part.count(b'"') - part.count(b'\\"')) & 1 for part in parts[:-1]):
+        return b"null".join(parts)
+    # 逐个跳过字符串的慢速路径
+    return _UNDEFINED_RE.sub(_replace_undefined, json_bytes)
+
 
 class XiaoHongShuParser(BaseParser):
     # 平台信息
@@ -21,6 +48,16 @@ class XiaoHongShuParser(BaseParser):
         ("xhslink.com", r"https?://xhslink\.com/[A-Za-z0-9._?%&+=/#@-]*"),
     ]
 
+    # 共享连接池的 client，首次使用时创建，复用 TCP/TLS 连接，启用 HTTP/2 多路复用
+    _pc_client: ClassVar[AsyncClient | None] = None
+    _ios_client: ClassVar[AsyncClient | None] = None
+    _limits: ClassVar[Limits] = Limits(max_keepalive_connections=20, keepalive_expiry=60)
+
+    @staticmethod
+    def _stateless_cookies() -> CookieJar:
+        """不保存任何 Set-Cookie 的 cookie jar，避免共享 client 在不同请求间累积 cookie"""
+        return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
     def __init__(self):
         super().__init__()
         explore_headers = {
@@ -40,6 +77,43 @@ class XiaoHongShuParser(BaseParser):
         if pconfig.use_xhs_cookie and pconfig.xhs_ck:
             self.headers["cookie"] = pconfig.xhs_ck
 
+    @property
+    def pc_client(self) -> AsyncClient:
+        """/explore 页面使用的共享 client"""
+        cls = type(self)
+        if cls._pc_client is None:
+            cls._pc_client = AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=self._limits,
+                http2=True,
+                cookies=self._stateless_cookies(),
+            )
+        return cls._pc_client
+
+    @property
+    def ios_client(self) -> AsyncClient:
+        """/discovery/item 页面使用的共享 client"""
+        cls = type(self)
+        if cls._ios_client is None:
+            cls._ios_client = AsyncClient(
+                headers=self.ios_headers,
+                timeout=self.timeout,
+                limits=self._limits,
+                http2=True,
+                cookies=self._stateless_cookies(),
+                trust_env=False,
+            )
+        return cls._ios_client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """关闭共享 client"""
+        for client in (cls._pc_client, cls._ios_client):
+            if client is not None:
+                await client.aclose()
+        cls._pc_client = cls._ios_client = None
+
     @override
     async def parse(self, keyword: str, searched: re.Match[str]):
         # 从匹配对象中获取原始URL
@@ -69,71 +143,28 @@ class XiaoHongShuParser(BaseParser):
 
     def _normalize_to_explore_url(self, url: str) -> tuple[str, str]:
         """将各种小红书链接统一转换为 /explore/ 形式，复用旧版解析逻辑。"""
-        # ?: 非捕获组
-        pattern = r"(?:/explore/|/discovery/item/|source=note&noteId=)(\w+)"
-        matched = re.search(pattern, url)
+        matched = _XHS_ID_RE.search(url)
         if not matched:
             raise ParseException("小红书分享链接不完整")
         xhs_id = matched.group(1)
 
-        # 解析 URL 参数，补全 xsec_source 和 xsec_token
-        parsed_url = urlparse(url)
-        params = parse_qs(parsed_url.query)
-        xsec_source = params.get("xsec_source", [None])[0] or "pc_feed"
-        xsec_token = params.get("xsec_token", [None])[0]
+        # 提取 URL 参数，补全 xsec_source 和 xsec_token，保持原有的百分号编码
+        source_matched = _XSEC_SOURCE_RE.search(url)
+        token_matched = _XSEC_TOKEN_RE.search(url)
+        xsec_source = source_matched.group(1) if source_matched else "pc_feed"
+        xsec_token = token_matched.group(1) if token_matched else None
 
         explore_url = f"https://www.xiaohongshu.com/explore/{xhs_id}?xsec_source={xsec_source}&xsec_token={xsec_token}"
         return xhs_id, explore_url
 
     async def _parse_explore(self, url: str, xhs_id: str):
-        async with AsyncClient(
-            headers=self.headers,
-            timeout=self.timeout,
-        ) as client:
-            response = await client.get(url)
-            html = response.text
-            logger.info(f"url: {response.url} | status_code: {response.status_code}")
-
-        json_obj = self._extract_initial_state_json(html)
+        json_obj = await self._fetch_initial_state_json(self.pc_client, url)
 
         # ["note"]["noteDetailMap"][xhs_id]["note"]
         note_data = json_obj.get("note", {}).get("noteDetailMap", {}).get(xhs_id, {}).get("note", {})
         if not note_data:
             raise ParseException("can't find note detail in json_obj")
 
-        class Image(Struct):
-            urlDefault: str
-
-        class User(Struct):
-            nickname: str
-            avatar: str
-
-        class NoteDetail(Struct):
-            type: str
-            title: str
-            desc: str
-            user: User
-            imageList: list[Image] = field(default_factory=list)
-            video: Video | None = None
-
-            @property
-            def nickname(self) -> str:
-                return self.user.nickname
-
-            @property
-            def avatar_url(self) -> str:
-                return self.user.avatar
-
-            @property
-            def image_urls(self) -> list[str]:
-                return [item.urlDefault for item in self.imageList]
-
-            @property
-            def video_url(self) -> str | None:
-                if self.type != "video" or not self.video:
-                    return None
-                return self.video.video_url
-
         note_detail = convert(note_data, type=NoteDetail)
 
         contents = []
@@ -158,17 +189,7 @@ class XiaoHongShuParser(BaseParser):
         )
 
     async def _parse_discovery(self, url: str):
-        async with AsyncClient(
-            headers=self.ios_headers,
-            timeout=self.timeout,
-            follow_redirects=True,
-            cookies=Cookies(),
-            trust_env=False,
-        ) as client:
-            response = await client.get(url)
-            html = response.text
-
-        json_obj = self._extract_initial_state_json(html)
+        json_obj = await self._fetch_initial_state_json(self.ios_client, url, follow_redirects=True)
         note_data = json_obj.get("noteData")
         if not note_data:
             raise ParseException("can't find noteData in json_obj")
@@ -177,43 +198,6 @@ class XiaoHongShuParser(BaseParser):
         if not note_data:
             raise ParseException("can't find noteData in noteData.data")
 
-        class Image(Struct):
-            url: str
-            urlSizeLarge: str | None = None
-
-        class User(Struct):
-            nickName: str
-            avatar: str
-
-        class NoteData(Struct):
-            type: str
-            title: str
-            desc: str
-            user: User
-            time: int
-            lastUpdateTime: int
-            imageList: list[Image] = []  # 有水印
-            video: Video | None = None
-
-            @property
-            def image_urls(self) -> list[str]:
-                return [item.url for item in self.imageList]
-
-            @property
-            def video_url(self) -> str | None:
-                if self.type != "video" or not self.video:
-                    return None
-                return self.video.video_url
-
-        class NormalNotePreloadData(Struct):
-            title: str
-            desc: str
-            imagesList: list[Image] = []  # 无水印, 但只有一只，用于视频封面
-
-            @property
-            def image_urls(self) -> list[str]:
-                return [item.urlSizeLarge or item.url for item in self.imagesList]
-
         note_data = convert(note_data, type=NoteData)
 
         contents = []
@@ -235,41 +219,154 @@ class XiaoHongShuParser(BaseParser):
             timestamp=note_data.time // 1000,
         )
 
-    def _extract_initial_state_json(self, html: str) -> dict[str, Any]:
-        pattern = r"window\.__INITIAL_STATE__=(.*?)</script>"
-        matched = re.search(pattern, html)
+    async def _fetch_initial_state_json(
+        self, client: AsyncClient, url: str, follow_redirects: bool = False
+    ) -> dict[str, Any]:
+        """流式读取页面，读到 __INITIAL_STATE__ 所在 script 结束即停止，不读取剩余 HTML"""
+        html = bytearray()
+        response = await self._send_stream(client, url, follow_redirects)
+        try:
+            logger.info(f"url: {response.url} | status_code: {response.status_code}")
+            start = -1
+            async for chunk in response.aiter_bytes():
+                offset = len(html)
+                html += chunk
+                # 从上一块末尾回退 token 长度开始查找，避免 token 被切分在两块之间
+                if start == -1:
+                    start = html.find(_INITIAL_STATE_MARKER, max(0, offset - len(_INITIAL_STATE_MARKER)))
+                if start != -1 and html.find(b"</script>", max(start, offset - len(b"</script>"))) != -1:
+                    break
+        finally:
+            await response.aclose()
+
+        return self._extract_initial_state_json(bytes(html))
+
+    async def _send_stream(self, client: AsyncClient, url: str, follow_redirects: bool) -> Response:
+        """发送流式 GET 请求，手动跟随重定向
+
+        共享 client 不保存 cookie，重定向途中设置的 cookie 存放在本次请求独立的 jar 中，只带给后续跳转
+        """
+        cookies = Cookies()
+        request = client.build_request("GET", url)
+        for _ in range(client.max_redirects + 1):
+            response = await client.send(request, stream=True, follow_redirects=False)
+            if not follow_redirects or response.next_request is None:
+                return response
+            cookies.extract_cookies(response)
+            await response.aclose()
+            request = response.next_request
+            cookies.set_cookie_header(request)
+        raise TooManyRedirects("Exceeded maximum allowed redirects.", request=request)
+
+    def _extract_initial_state_json(self, html: bytes) -> dict[str, Any]:
+        matched = _INITIAL_STATE_RE.search(html)
         if not matched:
             raise ParseException("小红书分享链接失效或内容已删除")
 
-        json_str = matched.group(1).replace("undefined", "null")
-        return json.loads(json_str)
+        json_bytes = _undefined_to_null(matched.group(1))
+        return msgspec.json.decode(json_bytes)
+
+
+get_driver().on_shutdown(XiaoHongShuParser.aclose)
 
 
-class Stream(Struct):
+class Stream(Struct, frozen=True, gc=False):
     h264: list[dict[str, Any]] | None = None
     h265: list[dict[str, Any]] | None = None
     av1: list[dict[str, Any]] | None = None
     h266: list[dict[str, Any]] | None = None
 
 
-class Media(Struct):
+class Media(Struct, frozen=True, gc=False):
     stream: Stream
 
 
-class Video(Struct):
+class Video(Struct, frozen=True, gc=False):
     media: Media
 
     @property
     def video_url(self) -> str | None:
         stream = self.media.stream
 
-        # h264 有水印，h265 无水印
-        if stream.h265:
-            return stream.h265[0]["masterUrl"]
-        elif stream.h264:
-            return stream.h264[0]["masterUrl"]
-        elif stream.av1:
-            return stream.av1[0]["masterUrl"]
-        elif stream.h266:
-            return stream.h266[0]["masterUrl"]
+        # 按优先级选择, h264 有水印，h265 无水印
+        for streams in (stream.h265, stream.h264, stream.av1, stream.h266):
+            if streams:
+                return streams[0]["masterUrl"]
         return None
+
+
+class ExploreImage(Struct, frozen=True, gc=False):
+    urlDefault: str
+
+
+class ExploreUser(Struct, frozen=True, gc=False):
+    nickname: str
+    avatar: str
+
+
+class NoteDetail(Struct, frozen=True, gc=False):
+    type: str
+    title: str
+    desc: str
+    user: ExploreUser
+    imageList: list[ExploreImage] = field(default_factory=list)
+    video: Video | None = None
+
+    @property
+    def nickname(self) -> str:
+        return self.user.nickname
+
+    @property
+    def avatar_url(self) -> str:
+        return self.user.avatar
+
+    @property
+    def image_urls(self) -> list[str]:
+        return [item.urlDefault for item in self.imageList]
+
+    @property
+    def video_url(self) -> str | None:
+        if self.type != "video" or not self.video:
+            return None
+        return self.video.video_url
+
+
+class DiscoveryImage(Struct, frozen=True, gc=False):
+    url: str
+    urlSizeLarge: str | None = None
+
+
+class DiscoveryUser(Struct, frozen=True, gc=False):
+    nickName: str
+    avatar: str
+
+
+class NoteData(Struct, frozen=True, gc=False):
+    type: str
+    title: str
+    desc: str
+    user: DiscoveryUser
+    time: int
+    lastUpdateTime: int
+    imageList: list[DiscoveryImage] = []  # 有水印
+    video: Video | None = None
+
+    @property
+    def image_urls(self) -> list[str]:
+        return [item.url for item in self.imageList]
+
+    @property
+    def video_url(self) -> str | None:
+        if self.type != "video" or not self.video:
+            return None
+        return self.video.video_url
+
+
+class NormalNotePreloadData(Struct, frozen=True, gc=False):
+    title: str
+    desc: str
+    imagesList: list[DiscoveryImage] = []  # 无水印, 但只有一只，用于视频封面
+
+    @property
+    def image_urls(self) -> list[str]:
+        return [item.urlSizeLarge or item.url for item in self.imagesList]
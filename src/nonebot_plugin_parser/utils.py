@@ -3,13 +3,14 @@ from collections import OrderedDict
 import hashlib
 from pathlib import Path
 import re
-from typing import Any, TypeVar
+from typing import Any, TypeVar, overload
 from urllib.parse import urlparse
 
 from nonebot import logger
 
 K = TypeVar("K")
 V = TypeVar("V")
+T = TypeVar("T")
 
 
 class LimitedSizeDict(OrderedDict[K, V]):
@@ -27,6 +28,33 @@ class LimitedSizeDict(OrderedDict[K, V]):
             self.popitem(last=False)  # 移除最早添加的项
 
 
+class LRUCache(LimitedSizeDict[K, V]):
+    """
+    LRU 缓存, 命中时刷新访问顺序, 超出容量时淘汰最久未使用的项
+    """
+
+    @overload
+    def get(self, key: K, default: None = None, /) -> V | None: ...
+
+    @overload
+    def get(self, key: K, default: V, /) -> V: ...
+
+    @overload
+    def get(self, key: K, default: T, /) -> V | T: ...
+
+    def get(self, key: K, default: Any = None, /) -> Any:
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key: K, value: V):
+        # 覆盖已存在的键时刷新顺序, 新键本就插入在末尾
+        if key in self:
+            self.move_to_end(key)
+        super().__setitem__(key, value)
+
+
 def keep_zh_en_num(text: str) -> str:
     """
     保留字符串中的中英文和数字
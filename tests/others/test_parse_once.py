@@ -0,0 +1,55 @@
+import asyncio
+import re
+
+import pytest
+
+
+async def test_parse_once_cancel(monkeypatch: pytest.MonkeyPatch):
+    from nonebot_plugin_parser import matchers
+    from nonebot_plugin_parser.matchers import _INFLIGHT, _parse_once
+    from nonebot_plugin_parser.matchers.rule import SearchResult
+    from nonebot_plugin_parser.parsers.data import ParseResult, Platform
+
+    result = ParseResult(platform=Platform(name="test", display_name="测试"))
+    release = asyncio.Event()
+    parse_count = 0
+
+    class FakeParser:
+        async def parse(self, keyword: str, searched: re.Match[str]) -> ParseResult:
+            nonlocal parse_count
+            parse_count += 1
+            await release.wait()
+            return result
+
+    monkeypatch.setitem(matchers.KEYWORD_PARSER_MAP, "test", FakeParser())
+    searched = re.match(r"test", "test")
+    assert searched is not None
+    sr = SearchResult(text="test", keyword="test", searched=searched)
+
+    # 等待者被取消不影响发起者和其他等待者
+    owner = asyncio.create_task(_parse_once("key", sr))
+    await asyncio.sleep(0)
+    cancelled_waiter = asyncio.create_task(_parse_once("key", sr))
+    waiter = asyncio.create_task(_parse_once("key", sr))
+    await asyncio.sleep(0)
+    cancelled_waiter.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await owner is result
+    assert await waiter is result
+    assert cancelled_waiter.cancelled()
+    assert parse_count == 1
+    assert "key" not in _INFLIGHT
+
+    # 发起者被取消时, 等待者重新发起解析, 不会收到 CancelledError
+    release.clear()
+    owner = asyncio.create_task(_parse_once("key", sr))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(_parse_once("key", sr))
+    await asyncio.sleep(0)
+    owner.cancel()
+    release.set()
+    assert await waiter is result
+    assert owner.cancelled()
+    assert parse_count == 3
+    assert "key" not in _INFLIGHT
@@ -0,0 +1,54 @@
+import asyncio
+from pathlib import Path
+
+
+async def test_persist_result_cache(tmp_path: Path):
+    from nonebot_plugin_parser.matchers.cache import load_result_cache, save_result_cache
+    from nonebot_plugin_parser.parsers.data import Author, ImageContent, ParseResult, Platform, VideoContent
+    from nonebot_plugin_parser.utils import LRUCache
+
+    video, cover, image = (tmp_path / name for name in ("video.mp4", "cover.jpg", "image.jpg"))
+    for file in (video, cover, image):
+        file.write_bytes(b"0")
+
+    async def done() -> Path:
+        return image
+
+    image_task = asyncio.create_task(done())
+    await image_task
+
+    platform = Platform(name="bilibili", display_name="哔哩哔哩")
+    cache = LRUCache[str, ParseResult](max_size=10)
+    cache["video"] = ParseResult(
+        platform=platform,
+        author=Author(name="author"),
+        title="title",
+        contents=[VideoContent(video, cover, 12.0), ImageContent(image_task)],
+        extra={"info": "info"},
+    )
+    cache["removed"] = ParseResult(platform=platform, contents=[ImageContent(tmp_path / "removed.jpg")])
+    pending_task = asyncio.create_task(asyncio.sleep(10, image))
+    cache["unfinished"] = ParseResult(platform=platform, contents=[ImageContent(pending_task)])
+
+    file = tmp_path / "result_cache.msgpack"
+    save_result_cache(cache, file)
+    pending_task.cancel()
+
+    restored = LRUCache[str, ParseResult](max_size=10)
+    load_result_cache(restored, file)
+
+    # 未完成的任务不持久化, 资源文件不存在的结果被丢弃
+    assert list(restored) == ["video"]
+    result = restored["video"]
+    assert result.platform == platform
+    assert result.author is not None
+    assert result.author.name == "author"
+    assert result.title == "title"
+    assert result.extra == {"info": "info"}
+    video_content, image_content = result.contents
+    assert isinstance(video_content, VideoContent)
+    assert video_content.path_task == video
+    assert video_content.cover == cover
+    assert video_content.duration == 12.0
+    assert isinstance(image_content, ImageContent)
+    assert image_content.path_task == image
@@ -0,0 +1,94 @@
+async def test_keyword_regex_rule():
+    from nonebot_plugin_alconna import UniMessage
+
+    from nonebot_plugin_parser.matchers.rule import PSR_SEARCHED_KEY, KeyPatternList, KeywordRegexRule, SearchResult
+
+    rule = KeywordRegexRule(
+        KeyPatternList(
+            ("BV", r"(BV[1-9a-zA-Z]{10})(?:\s)?(\d{1,3})?"),
+            ("ngabbs.com", r"tid=(?P<tid>\d+)"),
+            ("bbs.nga.cn", r"tid=(?P<tid>\d+)"),
+            ("acfun.cn", r"(?:ac=|/ac)(\d+)"),
+        )
+    )
+
+    async def search(text: str) -> SearchResult | None:
+        state = {}
+        if await rule(UniMessage(text), state):
+            return state[PSR_SEARCHED_KEY]
+        return None
+
+    # 保留原模式的分组
+    sr = await search("看看 BV1xx411c7mD 2")
+    assert sr is not None
+    assert sr.keyword == "BV"
+    assert sr.searched.group(1) == "BV1xx411c7mD"
+    assert sr.searched.group(2) == "2"
+
+    # 同一位置多个模式可匹配时, 按关键词选择
+    sr = await search("https://bbs.nga.cn/read.php?tid=12345")
+    assert sr is not None
+    assert sr.keyword == "bbs.nga.cn"
+    assert sr.searched.group("tid") == "12345"
+
+    # 关键词不存在时不匹配
+    assert await search("https://example.com/ac12345") is None
+    assert await search("nothing here") is None
+
+    # 多个链接时选择最靠前的, 而非模式列表中靠前的
+    sr = await search("https://www.acfun.cn/v/ac12345 BV1xx411c7mD")
+    assert sr is not None
+    assert sr.keyword == "acfun.cn"
+    sr = await search("BV1xx411c7mD https://www.acfun.cn/v/ac12345")
+    assert sr is not None
+    assert sr.keyword == "BV"
+
+
+async def test_keyword_regex_rule_flags():
+    import re
+
+    from nonebot_plugin_alconna import UniMessage
+    import pytest
+
+    from nonebot_plugin_parser.matchers.rule import PSR_SEARCHED_KEY, KeyPatternList, KeywordRegexRule
+
+    # 编译时的 flags 及全局内联标志在合并后仍然生效
+    rule = KeywordRegexRule(
+        KeyPatternList(
+            ("av", re.compile(r"av(\d+)", re.IGNORECASE)),
+            ("bv", r"(?i)bv(\w{10})"),
+            ("ep", re.compile(r"ep (\d+)  # 剧集", re.VERBOSE)),
+        )
+    )
+    for text, keyword in (("AV170001 av", "av"), ("BV1xx411c7mD bv", "bv"), ("ep123 ep", "ep")):
+        state = {}
+        assert await rule(UniMessage(text), state)
+        assert state[PSR_SEARCHED_KEY].keyword == keyword
+
+    # 合并后无法表示的反向引用在构造时拒绝
+    for pattern in (r"(?P<q>['\"]).*?(?P=q)", r"(a)\1", r"(a)?(?(1)b|c)"):
+        with pytest.raises(ValueError, match="backreference"):
+            KeywordRegexRule(KeyPatternList(("x", pattern)))
+
+
+async def test_union_pattern_scoped_flags():
+    from nonebot_plugin_alconna import UniMessage
+
+    from nonebot_plugin_parser.matchers.rule import PSR_SEARCHED_KEY, KeyPatternList, KeywordRegexRule, _union_pattern
+
+    rule = KeywordRegexRule(
+        KeyPatternList(
+            ("tiktok.com", r"(?:https?://)?(www|vt|vm)\.tiktok\.com/[A-Za-z0-9._?%&+\-=/#@]*"),
+            ("BV", r"(?i:bv)(\d+)"),
+        )
+    )
+    # 合并正则中的标记分组位于模式之后, 命中的分组名即模式下标
+    searched = _union_pattern(rule.alternatives).search("看看 BV123")
+    assert searched is not None
+    assert searched.lastgroup == "p1"
+
+    # 作用域内联标志 (?i:...) 的大小写不敏感在合并后仍然生效
+    state = {}
+    assert await rule(UniMessage("看看 BV123"), state)
+    assert state[PSR_SEARCHED_KEY].keyword == "BV"
+    assert state[PSR_SEARCHED_KEY].searched.group(1) == "123"
@@ -20,3 +20,21 @@ async def test_clean_plugin_cache():
     from nonebot_plugin_parser import clean_plugin_cache
 
     await clean_plugin_cache()
+
+
+def test_lru_cache():
+    from nonebot_plugin_parser.utils import LRUCache
+
+    cache = LRUCache[str, int](max_size=3)
+    for i in range(3):
+        cache[f"k{i}"] = i
+    # 命中 k0, 刷新其访问顺序
+    assert cache.get("k0") == 0
+    cache["k3"] = 3
+    # 淘汰最久未使用的 k1
+    assert "k1" not in cache
+    assert list(cache) == ["k2", "k0", "k3"]
+    assert cache.get("k1") is None
+    # 覆盖已存在的键也会刷新顺序
+    cache["k2"] = 20
+    assert list(cache) == ["k0", "k3", "k2"]
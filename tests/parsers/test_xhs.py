@@ -30,3 +30,124 @@ async def test_parse():
             assert path.exists()
 
     await asyncio.gather(*[parse(url) for url in urls])
+
+
+async def test_fetch_initial_state_json():
+    """流式读取 __INITIAL_STATE__ 测试"""
+    from httpx import AsyncClient, MockTransport, Request, Response
+
+    from nonebot_plugin_parser.parsers import XiaoHongShuParser
+
+    chunks = [
+        b"<html><head><script>window.__INITIAL",
+        # 字符串中的 :undefined, 保持原样
+        b'_STATE__={"note":{"id":"1","desc":"a:undefined,b \\"undefined]\\"",'
+        b'"tags":[undefined],"video":undefined}}</scr',
+        b"ipt></head>",
+        b"<body>" + b"x" * 1024 + b"</body></html>",
+    ]
+    sent: list[bytes] = []
+
+    async def stream():
+        for chunk in chunks:
+            sent.append(chunk)
+            yield chunk
+
+    def handler(request: Request) -> Response:
+        return Response(200, content=stream())
+
+    parser = XiaoHongShuParser()
+    async with AsyncClient(transport=MockTransport(handler)) as client:
+        json_obj = await parser._fetch_initial_state_json(client, "https://www.xiaohongshu.com/explore/1")
+
+    assert json_obj == {"note": {"id": "1", "desc": 'a:undefined,b "undefined]"', "tags": [None], "video": None}}
+    # 读到 </script> 后不再读取剩余内容
+    assert len(sent) == 3
+
+
+def test_undefined_to_null():
+    """仅替换字符串之外的 undefined 测试"""
+    from nonebot_plugin_parser.parsers.xiaohongshu import _undefined_to_null
+
+    cases = [
+        # 全部在字符串之外
+        (b'{"a":undefined,"b":[undefined],"c":"x"}', b'{"a":null,"b":[null],"c":"x"}'),
+        # 字符串中的 :undefined, 及转义引号
+        (
+            b'{"a":"x:undefined,y","b":"\\"undefined\\"","c":undefined}',
+            b'{"a":"x:undefined,y","b":"\\"undefined\\"","c":null}',
+        ),
+        # 转义的反斜杠结尾的字符串
+        (b'{"a":"x\\\\","b":undefined,"c":"undefined"}', b'{"a":"x\\\\","b":null,"c":"undefined"}'),
+        (b'{"a":1}', b'{"a":1}'),
+    ]
+    for json_bytes, expected in cases:
+        assert _undefined_to_null(json_bytes) == expected
+
+
+async def test_shared_clients_stateless_cookies():
+    """共享 client 不保存响应中的 cookie"""
+    from httpx import MockTransport, Request, Response
+
+    from nonebot_plugin_parser.parsers import XiaoHongShuParser
+
+    def handler(request: Request) -> Response:
+        html = b'<script>window.__INITIAL_STATE__={"cookie":"%s"}</script>' % request.headers.get("cookie", "").encode()
+        return Response(200, content=html, headers={"set-cookie": "session=1; Path=/"})
+
+    parser = XiaoHongShuParser()
+    for client in (parser.pc_client, parser.ios_client):
+        client._transport = MockTransport(handler)
+        for _ in range(2):
+            json_obj = await parser._fetch_initial_state_json(client, "https://www.xiaohongshu.com/explore/1")
+            assert json_obj == {"cookie": ""}
+        assert not client.cookies
+    await XiaoHongShuParser.aclose()
+
+
+async def test_fetch_follows_redirects_with_request_cookies():
+    """重定向途中设置的 cookie 只带给本次请求的后续跳转"""
+    from httpx import MockTransport, Request, Response
+
+    from nonebot_plugin_parser.parsers import XiaoHongShuParser
+
+    sent_cookies: list[str | None] = []
+
+    def handler(request: Request) -> Response:
+        sent_cookies.append(request.headers.get("cookie"))
+        if request.url.path == "/discovery/item/1":
+            return Response(302, headers={"location": "/discovery/item/2", "set-cookie": "hop=1; Path=/"})
+        return Response(200, content=b'<script>window.__INITIAL_STATE__={"ok":true}</script>')
+
+    parser = XiaoHongShuParser()
+    client = parser.ios_client
+    client._transport = MockTransport(handler)
+    for _ in range(2):
+        json_obj = await parser._fetch_initial_state_json(
+            client, "https://www.xiaohongshu.com/discovery/item/1", follow_redirects=True
+        )
+        assert json_obj == {"ok": True}
+    # 每次请求的首跳都不带 cookie, 跳转后带上重定向设置的 cookie
+    assert sent_cookies == [None, "hop=1", None, "hop=1"]
+    assert not client.cookies
+    await XiaoHongShuParser.aclose()
+
+
+def test_normalize_to_explore_url():
+    """链接统一转换为 /explore/ 形式测试"""
+    from nonebot_plugin_parser.parsers import XiaoHongShuParser
+
+    parser = XiaoHongShuParser()
+    url = (
+        "https://www.xiaohongshu.com/discovery/item/68b6bc8a000000001c0311c4"
+        "?app_platform=android&xsec_source=app_share&type=video&xsec_token=CBLD_3-DfBKy1ucX%3D&author_share=1"
+    )
+    xhs_id, explore_url = parser._normalize_to_explore_url(url)
+    assert xhs_id == "68b6bc8a000000001c0311c4"
+    assert explore_url == (
+        "https://www.xiaohongshu.com/explore/68b6bc8a000000001c0311c4?xsec_source=app_share&xsec_token=CBLD_3-DfBKy1ucX%3D"
+    )
+
+    # 缺省 xsec_source 时使用 pc_feed
+    _, explore_url = parser._normalize_to_explore_url("https://www.xiaohongshu.com/explore/abc?xsec_source=")
+    assert explore_url == "https://www.xiaohongshu.com/explore/abc?xsec_source=pc_feed&xsec_token=None"